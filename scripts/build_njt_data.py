@@ -15,17 +15,33 @@ Official data sources:
 from __future__ import annotations
 
 import argparse
+import array
+import contextlib
 import csv
 import datetime as dt
-import hashlib
+import functools
+import gzip
+import io
+import itertools
 import json
-import math
+import multiprocessing
+import operator
+import os
 import pathlib
 import re
 import shutil
+import sys
+import typing
 import urllib.request
 import zipfile
-from collections import defaultdict
+import zlib
+from collections import Counter, defaultdict
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+try:
+    import orjson
+except ImportError:  # Optional: stdlib json produces the same compact output, just slower.
+    orjson = None
 
 DAY_KEYS = (
     "monday",
@@ -41,6 +57,21 @@ PRIMARY_SHAPE_COVERAGE_TARGET = 0.95
 PRIMARY_SHAPE_SHARE_FLOOR = 0.10
 MAX_SHAPES_PER_DIRECTION = 4
 
+# Members inflated once into memory; stop_times.txt and shapes.txt are streamed instead.
+SMALL_GTFS_MEMBERS = ("routes.txt", "trips.txt", "stops.txt", "calendar.txt", "calendar_dates.txt")
+
+DIRECTION_KEY_UNSAFE_RE = re.compile(r"[^A-Za-z0-9_-]+")
+FILENAME_UNSAFE_RE = re.compile(r"[^A-Za-z0-9._-]+")
+DIGIT_RUN_RE = re.compile(r"(\d+)")
+HEX_COLOR_RE = re.compile(r"[0-9a-fA-F]{6}")
+
+# Lookup tables for the fixed-width fields of GTFS HH:MM:SS times.
+SEXAGESIMAL_FIELDS = {f"{value:02d}": value for value in range(60)}
+HOUR_FIELDS = {
+    **{str(value): value for value in range(10)},
+    **{f"{value:02d}": value for value in range(100)},
+}
+
 FEEDS = (
     {
         "id": "njt",
@@ -69,11 +100,95 @@ FEEDS = (
 )
 
 
-def iter_csv(zf: zipfile.ZipFile, member_name: str):
+def iter_csv_rows(fh: typing.BinaryIO, columns: tuple[str, ...]):
+    """Yield one tuple per CSV row with the requested columns (two or more), in order.
+
+    Columns missing from the header (and cells missing from short rows) read as "".
+    """
+    reader = csv.reader(io.TextIOWrapper(fh, encoding="utf-8-sig", newline=""))
+    header = next(reader, [])
+    header.extend(column for column in columns if column not in header)
+    width = len(header)
+    indices = [header.index(column) for column in columns]
+    pick = operator.itemgetter(*indices)
+
+    for row in reader:
+        if not row:
+            continue
+        if len(row) < width:
+            row.extend([""] * (width - len(row)))
+        yield pick(row)
+
+
+def iter_csv_cols(zf: zipfile.ZipFile, member_name: str, columns: tuple[str, ...]):
+    """Stream a (large) GTFS member straight out of the archive."""
     with zf.open(member_name) as fh:
-        reader = csv.DictReader((line.decode("utf-8-sig") for line in fh))
-        for row in reader:
-            yield row
+        yield from iter_csv_rows(fh, columns)
+
+
+def iter_csv_bytes(data: bytes, columns: tuple[str, ...]):
+    """Parse a GTFS member already read into memory (see SMALL_GTFS_MEMBERS)."""
+    yield from iter_csv_rows(io.BytesIO(data), columns)
+
+
+def dump_json(payload: dict, pretty: bool = False) -> bytes:
+    """Serialize compactly, or with 2-space indentation when ``pretty``."""
+    if orjson is not None:
+        return orjson.dumps(payload, option=orjson.OPT_INDENT_2 if pretty else 0)
+    if pretty:
+        return json.dumps(payload, indent=2, ensure_ascii=False).encode("utf-8")
+    return json.dumps(payload, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+
+
+def write_if_changed(path: pathlib.Path, data: bytes) -> bool:
+    """Write ``data`` unless ``path`` already holds exactly these bytes (keeps mtime/ETag)."""
+    try:
+        if path.stat().st_size == len(data) and path.read_bytes() == data:
+            return False
+    except FileNotFoundError:
+        pass
+    path.write_bytes(data)
+    return True
+
+
+def write_output(path: pathlib.Path, data: bytes, gzip_level: int) -> bool:
+    """write_if_changed, plus a precompressed ``<name>.gz`` sibling when ``gzip_level`` > 0."""
+    changed = write_if_changed(path, data)
+    if gzip_level:
+        # mtime=0 keeps the archive bytes deterministic so unchanged files stay untouched.
+        compressed = gzip.compress(data, compresslevel=gzip_level, mtime=0)
+        changed |= write_if_changed(path.with_name(f"{path.name}.gz"), compressed)
+    return changed
+
+
+def output_file_names(rel_paths: typing.Iterable[str], gzip_level: int) -> set[str]:
+    """File names emitted for the given manifest paths, including .gz siblings."""
+    names = {pathlib.PurePosixPath(rel_path).name for rel_path in rel_paths}
+    if gzip_level:
+        names |= {f"{name}.gz" for name in names}
+    return names
+
+
+def remove_stale_files(directory: pathlib.Path, keep: set[str]) -> int:
+    """Delete files in ``directory`` whose names are not in ``keep``; return how many."""
+    removed = 0
+    # scandir's DirEntry.is_file() reuses the d_type from the directory listing (no stat).
+    with os.scandir(directory) as entries:
+        for entry in entries:
+            if entry.name not in keep and entry.is_file():
+                os.unlink(entry.path)
+                removed += 1
+    return removed
+
+
+def manifest_content_unchanged(path: pathlib.Path, manifest: dict, pretty: bool) -> bool:
+    """Check whether the manifest on disk matches byte for byte, ignoring its generatedAt stamp."""
+    try:
+        existing = path.read_bytes()
+        generated_at = json.loads(existing)["generatedAt"]
+    except (FileNotFoundError, ValueError, KeyError):
+        return False
+    return dump_json({**manifest, "generatedAt": generated_at}, pretty) == existing
 
 
 def has_member(zf: zipfile.ZipFile, member_name: str) -> bool:
@@ -88,45 +203,51 @@ def parse_gtfs_date(value: str) -> dt.date:
     return dt.datetime.strptime(value, "%Y%m%d").date()
 
 
-def parse_time_to_seconds(value: str) -> int:
-    hours, minutes, seconds = value.split(":")
-    return int(hours) * 3600 + int(minutes) * 60 + int(seconds)
+def ordinal_weekday(ordinal: int) -> int:
+    # Ordinal 1 (0001-01-01) is a Monday, matching dt.date.weekday().
+    return (ordinal - 1) % 7
 
 
-def normalize_gtfs_time(value: str) -> str | None:
-    if not value:
-        return None
-    parts = value.split(":")
-    if len(parts) != 3:
+def parse_gtfs_time(value: str) -> int | None:
+    """Parse a GTFS H:MM:SS / HH:MM:SS time (hours may exceed 23) into seconds past midnight."""
+    if len(value) < 7 or value[-3] != ":" or value[-6] != ":":
         return None
-    try:
-        hours = int(parts[0])
-        minutes = int(parts[1])
-        seconds = int(parts[2])
-    except ValueError:
-        return None
-    if hours < 0 or minutes < 0 or minutes > 59 or seconds < 0 or seconds > 59:
+    hours = HOUR_FIELDS.get(value[:-6])
+    if hours is None and value[:-6].isascii() and value[:-6].isdigit():
+        # Hours of 100+ fall outside the table; they are rare enough to parse directly.
+        hours = int(value[:-6])
+    minutes = SEXAGESIMAL_FIELDS.get(value[-5:-3])
+    seconds = SEXAGESIMAL_FIELDS.get(value[-2:])
+    if hours is None or minutes is None or seconds is None:
         return None
-    return f"{hours:02d}:{minutes:02d}:{seconds:02d}"
+    return hours * 3600 + minutes * 60 + seconds
+
+
+def format_gtfs_time(seconds: int) -> str:
+    return f"{seconds // 3600:02d}:{seconds // 60 % 60:02d}:{seconds % 60:02d}"
 
 
 def normalize_whitespace(value: str) -> str:
-    return re.sub(r"\s+", " ", (value or "").strip())
+    return " ".join(value.split()) if value else ""
+
+
+def headsign_prefixes(short_name: str, route_id: str) -> list[tuple[str, int]]:
+    """Lowercased "<prefix> " matchers (with prefix length) stripped from trip headsigns."""
+    prefixes = (normalize_whitespace(short_name), normalize_whitespace(route_id))
+    return [(prefix.lower() + " ", len(prefix)) for prefix in prefixes if prefix]
 
 
-def normalize_trip_headsign(raw: str, short_name: str, route_id: str) -> str:
+def normalize_trip_headsign(raw: str, prefixes: list[tuple[str, int]]) -> str:
     headsign = normalize_whitespace(raw)
     if not headsign:
         return ""
 
-    prefixes = [normalize_whitespace(short_name), normalize_whitespace(route_id)]
-    for prefix in prefixes:
-        if not prefix:
-            continue
-        if not headsign.lower().startswith(prefix.lower() + " "):
+    headsign_lower = headsign.lower()
+    for prefix_lower, prefix_length in prefixes:
+        if not headsign_lower.startswith(prefix_lower):
             continue
 
-        trimmed = headsign[len(prefix) :].strip(" -")
+        trimmed = headsign[prefix_length:].strip(" -")
         if trimmed:
             return trimmed
 
@@ -136,12 +257,11 @@ def normalize_trip_headsign(raw: str, short_name: str, route_id: str) -> str:
 def build_direction_key(direction_id: str, headsign: str) -> str:
     direction_value = normalize_whitespace(direction_id)
     if direction_value:
-        safe_direction = re.sub(r"[^A-Za-z0-9_-]+", "_", direction_value).strip("_")
+        safe_direction = DIRECTION_KEY_UNSAFE_RE.sub("_", direction_value).strip("_")
         return f"dir_{safe_direction or '0'}"
 
     if headsign:
-        digest = hashlib.md5(headsign.lower().encode("utf-8")).hexdigest()[:10]
-        return f"hs_{digest}"
+        return f"hs_{zlib.crc32(headsign.lower().encode('utf-8')):08x}"
 
     return "dir_default"
 
@@ -162,13 +282,12 @@ def direction_sort_key(direction_id: str | None, label: str, direction_key: str)
 
 def normalize_color(raw: str) -> str | None:
     value = (raw or "").strip().lstrip("#")
-    if len(value) != 6:
-        return None
-    if not re.fullmatch(r"[0-9a-fA-F]{6}", value):
+    if not HEX_COLOR_RE.fullmatch(value):
         return None
-    if value.lower() == "000000":
+    value = value.lower()
+    if value == "000000":
         return None
-    return f"#{value.lower()}"
+    return f"#{value}"
 
 
 def hsl_to_hex(h: float, s: float, l: float) -> str:
@@ -195,100 +314,108 @@ def hsl_to_hex(h: float, s: float, l: float) -> str:
     return f"#{r:02x}{g:02x}{b:02x}"
 
 
+# Fallback route colors share saturation/lightness, so precompute one per integer hue.
+ROUTE_COLOR_BY_HUE = tuple(hsl_to_hex(hue, 0.68, 0.46) for hue in range(360))
+
+
 def stable_route_color(seed: str) -> str:
-    digest = hashlib.md5(seed.encode("utf-8")).hexdigest()
-    hue = int(digest[:4], 16) % 360
-    return hsl_to_hex(hue, 0.68, 0.46)
+    return ROUTE_COLOR_BY_HUE[(zlib.crc32(seed.encode("utf-8")) >> 16) % 360]
 
 
 def choose_representative_date(
-    date_trip_count: dict[dt.date, int], weekday_index: int, today: dt.date
-) -> dt.date | None:
-    candidates: list[tuple[dt.date, int]] = [
+    date_trip_count: dict[int, int], weekday_index: int, today: int
+) -> int | None:
+    """Pick the busiest date ordinal on the given weekday, preferring upcoming dates."""
+    candidates: list[tuple[int, int]] = [
         (service_date, trip_count)
         for service_date, trip_count in date_trip_count.items()
-        if service_date.weekday() == weekday_index
+        if ordinal_weekday(service_date) == weekday_index
     ]
     if not candidates:
         return None
 
-    def ranking(item: tuple[dt.date, int]) -> tuple[int, int, dt.date]:
+    def ranking(item: tuple[int, int]) -> tuple[int, int, int]:
         service_date, trip_count = item
         if service_date >= today:
-            distance_rank = (service_date - today).days
+            distance_rank = service_date - today
         else:
-            distance_rank = 100_000 + (today - service_date).days
+            distance_rank = 100_000 + (today - service_date)
         return (-trip_count, distance_rank, service_date)
 
-    return sorted(candidates, key=ranking)[0][0]
+    return min(candidates, key=ranking)[0]
 
 
 def download_gtfs(url: str, destination: pathlib.Path) -> None:
     destination.parent.mkdir(parents=True, exist_ok=True)
     with urllib.request.urlopen(url) as response, destination.open("wb") as out_file:
-        out_file.write(response.read())
+        shutil.copyfileobj(response, out_file, length=1024 * 1024)
 
 
 def collect_service_dates(
-    zf: zipfile.ZipFile,
+    members: dict[str, bytes],
     relevant_service_ids: set[str],
-) -> dict[str, set[dt.date]]:
-    service_dates: dict[str, set[dt.date]] = defaultdict(set)
+) -> dict[str, frozenset[int]]:
+    """Map each relevant service_id to the date ordinals it runs on."""
+    service_dates: dict[str, set[int]] = defaultdict(set)
 
-    if has_member(zf, "calendar.txt"):
-        for row in iter_csv(zf, "calendar.txt"):
-            service_id = row["service_id"]
+    if "calendar.txt" in members:
+        for service_id, raw_start_date, raw_end_date, *day_flags in iter_csv_bytes(
+            members["calendar.txt"], ("service_id", "start_date", "end_date", *DAY_KEYS)
+        ):
+            service_id = service_id.strip()
             if service_id not in relevant_service_ids:
                 continue
 
             try:
-                start_date = parse_gtfs_date(row["start_date"])
-                end_date = parse_gtfs_date(row["end_date"])
-            except (KeyError, ValueError):
+                start_date = parse_gtfs_date(raw_start_date).toordinal()
+                end_date = parse_gtfs_date(raw_end_date).toordinal()
+            except ValueError:
                 continue
 
-            active_weekdays = {
-                idx
-                for idx, key in enumerate(DAY_KEYS)
-                if str(row.get(key, "0")).strip() == "1"
-            }
-            if not active_weekdays:
+            weekday_mask = 0
+            for weekday_index, flag in enumerate(day_flags):
+                if flag.strip() == "1":
+                    weekday_mask |= 1 << weekday_index
+            if not weekday_mask:
                 continue
 
-            cursor = start_date
-            while cursor <= end_date:
-                if cursor.weekday() in active_weekdays:
-                    service_dates[service_id].add(cursor)
-                cursor += dt.timedelta(days=1)
+            # Walk each active weekday in 7-day strides from its first date in range.
+            start_weekday = ordinal_weekday(start_date)
+            for weekday_index in range(len(DAY_KEYS)):
+                if weekday_mask >> weekday_index & 1:
+                    first_date = start_date + (weekday_index - start_weekday) % 7
+                    service_dates[service_id].update(range(first_date, end_date + 1, 7))
 
-    if has_member(zf, "calendar_dates.txt"):
-        for row in iter_csv(zf, "calendar_dates.txt"):
-            service_id = row["service_id"]
+    if "calendar_dates.txt" in members:
+        for service_id, raw_date, exception_type in iter_csv_bytes(
+            members["calendar_dates.txt"], ("service_id", "date", "exception_type")
+        ):
+            service_id = service_id.strip()
             if service_id not in relevant_service_ids:
                 continue
 
             try:
-                service_date = parse_gtfs_date(row["date"])
+                service_date = parse_gtfs_date(raw_date).toordinal()
             except ValueError:
                 continue
 
-            exception_type = str(row.get("exception_type", "")).strip()
+            exception_type = exception_type.strip()
             if exception_type == "1":
                 service_dates[service_id].add(service_date)
             elif exception_type == "2":
                 service_dates[service_id].discard(service_date)
 
-    return service_dates
+    return {service_id: frozenset(dates) for service_id, dates in service_dates.items()}
 
 
 def sanitize_filename(value: str) -> str:
-    cleaned = re.sub(r"[^A-Za-z0-9._-]+", "_", value.strip())
+    cleaned = FILENAME_UNSAFE_RE.sub("_", value.strip())
     cleaned = cleaned.strip("._-")
     return cleaned or "route"
 
 
 def natural_sort_key(value: str):
-    parts = re.split(r"(\d+)", value)
+    parts = DIGIT_RUN_RE.split(value)
     key = []
     for part in parts:
         if part.isdigit():
@@ -301,37 +428,49 @@ def natural_sort_key(value: str):
 def dedupe_and_simplify_shape(
     sequence_points: list[tuple[int, float, float]], max_points: int
 ) -> list[list[float]]:
-    ordered = sorted(sequence_points, key=lambda p: p[0])
+    ordered = sorted(sequence_points, key=operator.itemgetter(0))
+    rounded = [[round(lat, 6), round(lon, 6)] for _, lat, lon in ordered]
 
-    cleaned: list[list[float]] = []
-    previous = None
-    for _, lat, lon in ordered:
-        current = [round(lat, 6), round(lon, 6)]
-        if current == previous:
-            continue
-        cleaned.append(current)
-        previous = current
+    cleaned = rounded[:1]
+    cleaned.extend(
+        current for previous, current in zip(rounded, rounded[1:]) if current != previous
+    )
 
     if len(cleaned) <= max_points:
         return cleaned
 
-    step = max(1, math.ceil(len(cleaned) / max_points))
-    simplified = [cleaned[0]]
-    simplified.extend(cleaned[idx] for idx in range(step, len(cleaned) - 1, step))
-    simplified.append(cleaned[-1])
+    # Evenly spaced indices (first and last included), like an integer linspace.
+    last_index = len(cleaned) - 1
+    span = max_points - 1
+    return [cleaned[idx * last_index // span] for idx in range(max_points)]
 
-    # In rare cases, simplification can still overshoot by 1 due to division.
-    if len(simplified) > max_points:
-        ratio = len(simplified) / max_points
-        out = [simplified[0]]
-        cursor = ratio
-        while len(out) < max_points - 1:
-            out.append(simplified[int(cursor)])
-            cursor += ratio
-        out.append(simplified[-1])
-        simplified = out
 
-    return simplified
+def compute_bounds(shapes: list[dict], stops: list[dict]) -> list[list[float]] | None:
+    """Return [[min_lat, min_lon], [max_lat, max_lon]] over shape points and stops."""
+    points = itertools.chain(
+        (point for shape in shapes for point in shape["points"]),
+        ((stop["lat"], stop["lon"]) for stop in stops),
+    )
+    first = next(points, None)
+    if first is None:
+        return None
+
+    lat_min = lat_max = first[0]
+    lon_min = lon_max = first[1]
+    for lat, lon in points:
+        if lat < lat_min:
+            lat_min = lat
+        elif lat > lat_max:
+            lat_max = lat
+        if lon < lon_min:
+            lon_min = lon
+        elif lon > lon_max:
+            lon_max = lon
+
+    return [
+        [round(lat_min, 6), round(lon_min, 6)],
+        [round(lat_max, 6), round(lon_max, 6)],
+    ]
 
 
 def choose_display_shapes(
@@ -478,6 +617,255 @@ def choose_display_shapes(
     return out
 
 
+def emit_route(state: dict, route_id: str) -> tuple[dict, bool]:
+    """Write one route's JSON (and external schedule file).
+
+    Returns the route's manifest entry and whether any file on disk changed.
+
+    ``state`` holds the read-only per-feed lookups assembled by build_feed.
+    """
+    agency_id = state["agency_id"]
+    agency_label = state["agency_label"]
+    routes_dir = state["routes_dir"]
+    schedules_dir = state["schedules_dir"]
+    schedule_mode = state["schedule_mode"]
+    pretty = state["pretty"]
+    gzip_level = state["gzip_level"]
+    route_trip_ids = state["route_trip_ids"]
+    route_service_ids = state["route_service_ids"]
+    route_direction_keys = state["route_direction_keys"]
+    route_direction_labels = state["route_direction_labels"]
+    route_direction_trip_counts = state["route_direction_trip_counts"]
+    route_direction_shape_trip_counts = state["route_direction_shape_trip_counts"]
+    representative_dates = state["representative_dates"]
+    active_services_by_route_day_direction = state["active_services_by_route_day_direction"]
+    route_stop_ids = state["route_stop_ids"]
+    stop_schedule_seconds = state["stop_schedule_seconds"]
+    stop_info = state["stop_info"]
+    route_shapes = state["route_shapes"]
+    meta = state["route_meta"][route_id]
+
+    route_key = f"{agency_id}:{route_id}"
+    route_stops = []
+    direction_keys = route_direction_keys.get(route_id, ["dir_default"])
+    direction_labels = route_direction_labels.get(route_id) or {
+        "dir_default": fallback_direction_label(None)
+    }
+    route_service_order = sorted(route_service_ids[route_id])
+
+    for stop_id in sorted(
+        route_stop_ids[route_id],
+        key=lambda sid: (
+            stop_info.get(sid, {}).get("name", sid).lower(),
+            sid,
+        ),
+    ):
+        info = stop_info.get(stop_id)
+        if not info:
+            continue
+
+        stop_payload = {**info}
+        if schedule_mode == "inline":
+            direction_schedule: dict[str, dict[str, list[str]]] = {}
+            for direction_key in direction_keys:
+                service_schedule_for_direction: dict[str, list[str]] = {}
+                for service_id in route_service_order:
+                    seconds = stop_schedule_seconds.get(
+                        (route_id, stop_id, direction_key, service_id)
+                    )
+                    if seconds:
+                        service_schedule_for_direction[service_id] = [
+                            format_gtfs_time(value) for value in sorted(set(seconds))
+                        ]
+                if service_schedule_for_direction:
+                    direction_schedule[direction_key] = service_schedule_for_direction
+
+            stop_payload["serviceScheduleByDirection"] = direction_schedule
+
+        route_stops.append(stop_payload)
+
+    shapes = choose_display_shapes(
+        route_shapes.get(route_id, []),
+        direction_keys,
+        route_direction_trip_counts.get(route_id, {}),
+        route_direction_shape_trip_counts.get(route_id, {}),
+    )
+
+    bounds = compute_bounds(shapes, route_stops)
+
+    representative_dates_json = {
+        day_key: (
+            dt.date.fromordinal(representative_dates[route_id][day_key]).isoformat()
+            if representative_dates[route_id][day_key]
+            else None
+        )
+        for day_key in DAY_KEYS
+    }
+
+    filename = (
+        f"{agency_id}_{sanitize_filename(meta['shortName'])}_{sanitize_filename(route_id)}.json"
+    )
+    route_file_rel = f"routes/{filename}"
+
+    route_payload = {
+        "key": route_key,
+        "agencyId": agency_id,
+        "agencyLabel": agency_label,
+        "mode": meta["mode"],
+        "routeId": route_id,
+        "shortName": meta["shortName"],
+        "longName": meta["longName"],
+        "routeDesc": meta["routeDesc"],
+        "label": meta["label"],
+        "color": meta["color"],
+        "gtfsColor": meta["gtfsColor"],
+        "tripCount": len(route_trip_ids[route_id]),
+        "stopCount": len(route_stops),
+        "shapeCount": len(shapes),
+        "bounds": bounds,
+        "shapes": shapes,
+        "stops": route_stops,
+        "directionLabels": direction_labels,
+    }
+    files_changed = False
+    if schedule_mode == "inline":
+        active_services_by_direction_json = {
+            direction_key: {
+                day_key: sorted(
+                    active_services_by_route_day_direction[route_id][direction_key][day_key]
+                )
+                for day_key in DAY_KEYS
+            }
+            for direction_key in direction_keys
+        }
+        route_payload["representativeDates"] = representative_dates_json
+        route_payload["activeServicesByDayByDirection"] = active_services_by_direction_json
+    elif schedule_mode == "external":
+        if schedules_dir is None:
+            raise RuntimeError("schedules_dir is required when schedule_mode='external'")
+
+        day_schedules_by_stop_by_direction: dict[str, dict[str, dict[str, list[str]]]] = {}
+        for stop in route_stops:
+            stop_id = stop["stopId"]
+            day_schedule_by_direction: dict[str, dict[str, list[str]]] = {}
+
+            for direction_key in direction_keys:
+                day_schedule_for_direction: dict[str, list[str]] = {}
+                for day_key in DAY_KEYS:
+                    merged: set[int] = set()
+                    active_services = active_services_by_route_day_direction[route_id][
+                        direction_key
+                    ][day_key]
+                    for service_id in active_services:
+                        merged.update(
+                            stop_schedule_seconds.get(
+                                (route_id, stop_id, direction_key, service_id), ()
+                            )
+                        )
+
+                    day_schedule_for_direction[day_key] = [
+                        format_gtfs_time(value) for value in sorted(merged)
+                    ]
+
+                day_schedule_by_direction[direction_key] = day_schedule_for_direction
+
+            day_schedules_by_stop_by_direction[stop_id] = day_schedule_by_direction
+
+        schedule_filename = filename.replace(".json", "_schedule.json")
+        schedule_file_rel = f"schedules/{schedule_filename}"
+        schedule_payload = {
+            "key": route_key,
+            "agencyId": agency_id,
+            "routeId": route_id,
+            "representativeDates": representative_dates_json,
+            "directionLabels": direction_labels,
+            "daySchedulesByStopByDirection": day_schedules_by_stop_by_direction,
+        }
+        files_changed |= write_output(
+            schedules_dir / schedule_filename, dump_json(schedule_payload, pretty), gzip_level
+        )
+        route_payload["scheduleFile"] = schedule_file_rel
+
+    files_changed |= write_output(
+        routes_dir / filename, dump_json(route_payload, pretty), gzip_level
+    )
+
+    search_parts = [
+        meta["shortName"],
+        meta["longName"],
+        meta["routeDesc"],
+        agency_label,
+    ]
+    if meta["mode"] == "rail":
+        search_parts.append("rail train line station")
+    else:
+        search_parts.append("bus route stop")
+    if agency_id == "princeton":
+        if meta["shortName"] in {"TPL", "TPLEXP"}:
+            search_parts.append("Princeton Loop")
+        elif meta["shortName"] == "WS":
+            search_parts.append("Weekend Shopper")
+        else:
+            search_parts.append("TigerTransit Tiger Transit")
+
+    long_bits = " ".join(part for part in search_parts if part)
+
+    manifest_entry = {
+        "key": route_key,
+        "agencyId": agency_id,
+        "agencyLabel": agency_label,
+        "mode": meta["mode"],
+        "routeId": route_id,
+        "shortName": meta["shortName"],
+        "longName": meta["longName"],
+        "routeDesc": meta["routeDesc"],
+        "label": meta["label"],
+        "color": meta["color"],
+        "tripCount": len(route_trip_ids[route_id]),
+        "stopCount": len(route_stops),
+        "shapeCount": len(shapes),
+        "bounds": bounds,
+        "file": route_file_rel,
+        "searchText": long_bits.lower(),
+    }
+    if schedule_mode == "external":
+        manifest_entry["scheduleFile"] = route_payload.get("scheduleFile")
+
+    return manifest_entry, files_changed
+
+
+# Per-feed emit state, inherited by forked emit workers instead of being pickled.
+_WORKER_EMIT_STATE: dict | None = None
+
+
+def _init_emit_worker(state: dict) -> None:
+    global _WORKER_EMIT_STATE
+    _WORKER_EMIT_STATE = state
+
+
+def _emit_route_in_worker(route_id: str) -> tuple[dict, bool]:
+    return emit_route(_WORKER_EMIT_STATE, route_id)
+
+
+def emit_routes(state: dict, route_ids: list[str], jobs: int) -> list[tuple[dict, bool]]:
+    """Emit routes across ``jobs`` workers, returning emit_route results in ``route_ids`` order."""
+    if jobs <= 1 or len(route_ids) < 2:
+        return [emit_route(state, route_id) for route_id in route_ids]
+
+    if "fork" in multiprocessing.get_all_start_methods():
+        with ProcessPoolExecutor(
+            max_workers=jobs,
+            mp_context=multiprocessing.get_context("fork"),
+            initializer=_init_emit_worker,
+            initargs=(state,),
+        ) as executor:
+            return list(executor.map(_emit_route_in_worker, route_ids, chunksize=8))
+
+    # Without fork the state would have to be pickled per worker; threads share it instead.
+    with ThreadPoolExecutor(max_workers=jobs) as executor:
+        return list(executor.map(functools.partial(emit_route, state), route_ids))
+
+
 def build_feed(
     feed_config: dict,
     gtfs_zip_path: pathlib.Path,
@@ -486,23 +874,29 @@ def build_feed(
     max_shape_points: int,
     schedule_mode: str,
     today: dt.date,
-) -> tuple[dict, list[dict]]:
+    jobs: int,
+    pretty: bool,
+    gzip_level: int,
+) -> tuple[dict, list[dict], bool]:
     agency_id = feed_config["id"]
     agency_label = feed_config["label"]
     feed_mode = feed_config["mode"]
     gtfs_url = feed_config["gtfs_url"]
 
     with zipfile.ZipFile(gtfs_zip_path) as zf:
+        members = {name: zf.read(name) for name in SMALL_GTFS_MEMBERS if has_member(zf, name)}
         route_meta: dict[str, dict] = {}
 
-        for row in iter_csv(zf, "routes.txt"):
-            route_id = row["route_id"].strip()
-            short_name = row.get("route_short_name", "").strip() or route_id
-            long_name = row.get("route_long_name", "").strip()
-            route_desc = row.get("route_desc", "").strip()
-            route_color = normalize_color(row.get("route_color", "")) or stable_route_color(
-                f"{agency_id}:{short_name}:{route_id}"
+        for route_id, short_name, long_name, route_desc, raw_color in iter_csv_bytes(
+            members["routes.txt"],
+            ("route_id", "route_short_name", "route_long_name", "route_desc", "route_color"),
+        ):
+            route_id, short_name, long_name, route_desc = map(
+                str.strip, (route_id, short_name, long_name, route_desc)
             )
+            short_name = short_name or route_id
+            gtfs_color = normalize_color(raw_color)
+            route_color = gtfs_color or stable_route_color(f"{agency_id}:{short_name}:{route_id}")
 
             route_meta[route_id] = {
                 "routeId": route_id,
@@ -512,12 +906,12 @@ def build_feed(
                 "label": f"{short_name} {long_name}".strip(),
                 "mode": feed_mode,
                 "color": route_color,
-                "gtfsColor": normalize_color(row.get("route_color", "")) or "",
+                "gtfsColor": gtfs_color or "",
+                "headsignPrefixes": headsign_prefixes(short_name, route_id),
             }
 
-        trip_to_route: dict[str, str] = {}
-        trip_to_service: dict[str, str] = {}
-        trip_to_direction_key: dict[str, str] = {}
+        # trip_id -> (route_id, direction_key, service_id), resolved with one lookup per stop time.
+        trip_context: dict[str, tuple[str, str, str]] = {}
         route_shape_ids: dict[str, set[str]] = defaultdict(set)
         route_shape_direction_keys: dict[str, dict[str, set[str]]] = defaultdict(
             lambda: defaultdict(set)
@@ -530,6 +924,7 @@ def build_feed(
         )
         route_trip_ids: dict[str, set[str]] = defaultdict(set)
         route_service_ids: dict[str, set[str]] = defaultdict(set)
+        service_route_trip_counts: dict[str, Counter[str]] = defaultdict(Counter)
         route_direction_service_ids: dict[str, dict[str, set[str]]] = defaultdict(
             lambda: defaultdict(set)
         )
@@ -538,27 +933,31 @@ def build_feed(
             lambda: defaultdict(lambda: defaultdict(int))
         )
 
-        for row in iter_csv(zf, "trips.txt"):
-            route_id = row["route_id"].strip()
+        for trip_id, route_id, service_id, shape_id, direction_id, raw_headsign in iter_csv_bytes(
+            members["trips.txt"],
+            ("trip_id", "route_id", "service_id", "shape_id", "direction_id", "trip_headsign"),
+        ):
+            route_id = route_id.strip()
             if route_id not in route_meta:
                 continue
 
-            trip_id = row["trip_id"].strip()
-            service_id = row["service_id"].strip()
-            shape_id = row.get("shape_id", "").strip()
-            direction_id = normalize_whitespace(row.get("direction_id", ""))
+            # Low-cardinality ids repeat on every trip; intern them so the per-trip
+            # tuples and sets share one string object per id.
+            trip_id = trip_id.strip()
+            route_id = sys.intern(route_id)
+            service_id = sys.intern(service_id.strip())
+            shape_id = sys.intern(shape_id.strip())
+            direction_id = normalize_whitespace(direction_id)
             trip_headsign = normalize_trip_headsign(
-                row.get("trip_headsign", ""),
-                route_meta[route_id]["shortName"],
-                route_id,
+                raw_headsign,
+                route_meta[route_id]["headsignPrefixes"],
             )
-            direction_key = build_direction_key(direction_id, trip_headsign)
+            direction_key = sys.intern(build_direction_key(direction_id, trip_headsign))
 
-            trip_to_route[trip_id] = route_id
-            trip_to_service[trip_id] = service_id
-            trip_to_direction_key[trip_id] = direction_key
+            trip_context[trip_id] = (route_id, direction_key, service_id)
             route_trip_ids[route_id].add(trip_id)
             route_service_ids[route_id].add(service_id)
+            service_route_trip_counts[service_id][route_id] += 1
             route_direction_service_ids[route_id][direction_key].add(service_id)
             route_direction_trip_counts[route_id][direction_key] += 1
             if shape_id:
@@ -613,17 +1012,23 @@ def build_feed(
         for service_set in route_service_ids.values():
             relevant_service_ids.update(service_set)
 
-        service_dates = collect_service_dates(zf, relevant_service_ids)
+        service_dates = collect_service_dates(members, relevant_service_ids)
 
-        route_date_trip_count: dict[str, dict[dt.date, int]] = defaultdict(
-            lambda: defaultdict(int)
-        )
-        for trip_id, route_id in trip_to_route.items():
-            service_id = trip_to_service[trip_id]
-            for service_date in service_dates.get(service_id, set()):
-                route_date_trip_count[route_id][service_date] += 1
+        route_date_trip_count: dict[str, Counter[int]] = defaultdict(Counter)
+        for service_id, trip_counts_by_route in service_route_trip_counts.items():
+            active_dates = service_dates.get(service_id, ())
+            for route_id, trip_count in trip_counts_by_route.items():
+                date_trip_count = route_date_trip_count[route_id]
+                for service_date in active_dates:
+                    date_trip_count[service_date] += trip_count
+
+        services_active_on: dict[int, set[str]] = defaultdict(set)
+        for service_id, active_dates in service_dates.items():
+            for service_date in active_dates:
+                services_active_on[service_date].add(service_id)
 
-        representative_dates: dict[str, dict[str, dt.date | None]] = defaultdict(dict)
+        today_ordinal = today.toordinal()
+        representative_dates: dict[str, dict[str, int | None]] = defaultdict(dict)
         active_services_by_route_day_direction: dict[str, dict[str, dict[str, set[str]]]] = (
             defaultdict(lambda: defaultdict(dict))
         )
@@ -631,73 +1036,83 @@ def build_feed(
         for route_id in route_meta:
             for weekday_index, day_key in enumerate(DAY_KEYS):
                 chosen_date = choose_representative_date(
-                    route_date_trip_count[route_id], weekday_index, today
+                    route_date_trip_count[route_id], weekday_index, today_ordinal
                 )
                 representative_dates[route_id][day_key] = chosen_date
 
             for direction_key in route_direction_keys[route_id]:
+                direction_service_ids = route_direction_service_ids[route_id][direction_key]
                 for day_key in DAY_KEYS:
                     chosen_date = representative_dates[route_id][day_key]
                     if not chosen_date:
                         active_services_by_route_day_direction[route_id][direction_key][day_key] = set()
                         continue
 
-                    active_services = {
-                        service_id
-                        for service_id in route_direction_service_ids[route_id][direction_key]
-                        if chosen_date in service_dates.get(service_id, set())
-                    }
+                    active_services = direction_service_ids & services_active_on.get(
+                        chosen_date, set()
+                    )
                     active_services_by_route_day_direction[route_id][direction_key][day_key] = (
                         active_services
                     )
 
         route_stop_ids: dict[str, set[str]] = defaultdict(set)
-        route_stop_schedule_by_service_direction: dict[
-            str, dict[str, dict[str, dict[str, set[str]]]]
-        ] = defaultdict(lambda: defaultdict(lambda: defaultdict(lambda: defaultdict(set))))
-
-        for row in iter_csv(zf, "stop_times.txt"):
-            trip_id = row["trip_id"].strip()
-            route_id = trip_to_route.get(trip_id)
-            if not route_id:
+        # (route_id, stop_id, direction_key, service_id) -> departure seconds, deduped on emit.
+        stop_schedule_seconds: dict[tuple[str, str, str, str], array.array] = {}
+        # Departure strings repeat heavily across trips; parse each distinct one once.
+        parsed_times: dict[str, int | None] = {}
+
+        for trip_id, stop_id, departure_time, arrival_time in iter_csv_cols(
+            zf,
+            "stop_times.txt",
+            ("trip_id", "stop_id", "departure_time", "arrival_time"),
+        ):
+            context = trip_context.get(trip_id.strip())
+            if context is None:
                 continue
 
-            stop_id = row["stop_id"].strip()
+            route_id, direction_key, service_id = context
+
+            stop_id = sys.intern(stop_id.strip())
             route_stop_ids[route_id].add(stop_id)
 
             if schedule_mode == "none":
                 continue
 
-            raw_time = row.get("departure_time") or row.get("arrival_time") or ""
-            normalized_time = normalize_gtfs_time(raw_time.strip())
-            if not normalized_time:
+            raw_time = departure_time or arrival_time
+            try:
+                departure_seconds = parsed_times[raw_time]
+            except KeyError:
+                departure_seconds = parsed_times[raw_time] = parse_gtfs_time(raw_time.strip())
+            if departure_seconds is None:
                 continue
 
-            service_id = trip_to_service[trip_id]
-            direction_key = trip_to_direction_key.get(trip_id, "dir_default")
-            route_stop_schedule_by_service_direction[route_id][stop_id][direction_key][
-                service_id
-            ].add(normalized_time)
+            schedule_key = (route_id, stop_id, direction_key, service_id)
+            seconds = stop_schedule_seconds.get(schedule_key)
+            if seconds is None:
+                seconds = stop_schedule_seconds[schedule_key] = array.array("I")
+            seconds.append(departure_seconds)
 
         selected_stop_ids: set[str] = set()
         for route_id in route_meta:
             selected_stop_ids.update(route_stop_ids[route_id])
 
         stop_info: dict[str, dict] = {}
-        for row in iter_csv(zf, "stops.txt"):
-            stop_id = row["stop_id"].strip()
+        for stop_id, stop_name, raw_lat, raw_lon in iter_csv_bytes(
+            members["stops.txt"], ("stop_id", "stop_name", "stop_lat", "stop_lon")
+        ):
+            stop_id = stop_id.strip()
             if stop_id not in selected_stop_ids:
                 continue
 
             try:
-                lat = float(row["stop_lat"])
-                lon = float(row["stop_lon"])
-            except (ValueError, TypeError):
+                lat = float(raw_lat)
+                lon = float(raw_lon)
+            except ValueError:
                 continue
 
             stop_info[stop_id] = {
                 "stopId": stop_id,
-                "name": row.get("stop_name", "").strip() or stop_id,
+                "name": stop_name.strip() or stop_id,
                 "lat": round(lat, 6),
                 "lon": round(lon, 6),
             }
@@ -746,8 +1161,12 @@ def build_feed(
                     }
                     route_shapes[route_id].append(entry)
 
-            for row in iter_csv(zf, "shapes.txt"):
-                shape_id = row["shape_id"].strip()
+            for shape_id, raw_sequence, raw_lat, raw_lon in iter_csv_cols(
+                zf,
+                "shapes.txt",
+                ("shape_id", "shape_pt_sequence", "shape_pt_lat", "shape_pt_lon"),
+            ):
+                shape_id = shape_id.strip()
                 if shape_id not in shape_to_routes:
                     continue
 
@@ -760,9 +1179,9 @@ def build_feed(
                     current_points = []
 
                 try:
-                    sequence = int(row["shape_pt_sequence"])
-                    lat = float(row["shape_pt_lat"])
-                    lon = float(row["shape_pt_lon"])
+                    sequence = int(raw_sequence)
+                    lat = float(raw_lat)
+                    lon = float(raw_lon)
                 except (ValueError, TypeError):
                     continue
 
@@ -777,209 +1196,31 @@ def build_feed(
                 dt.datetime(*newest_entry.date_time).replace(tzinfo=dt.timezone.utc).isoformat()
             )
 
-    manifest_entries: list[dict] = []
-
-    for route_id, meta in route_meta.items():
-        route_key = f"{agency_id}:{route_id}"
-        route_stops = []
-        direction_keys = route_direction_keys.get(route_id, ["dir_default"])
-        direction_labels = route_direction_labels.get(route_id) or {
-            "dir_default": fallback_direction_label(None)
-        }
-
-        for stop_id in sorted(
-            route_stop_ids[route_id],
-            key=lambda sid: (
-                stop_info.get(sid, {}).get("name", sid).lower(),
-                sid,
-            ),
-        ):
-            info = stop_info.get(stop_id)
-            if not info:
-                continue
-
-            stop_payload = {**info}
-            if schedule_mode == "inline":
-                direction_schedule: dict[str, dict[str, list[str]]] = {}
-                by_direction = route_stop_schedule_by_service_direction[route_id][stop_id]
-                for direction_key in direction_keys:
-                    by_service = by_direction.get(direction_key, {})
-                    service_schedule_for_direction: dict[str, list[str]] = {}
-                    for service_id, times in by_service.items():
-                        if service_id not in route_service_ids[route_id]:
-                            continue
-                        sorted_times = sorted(times, key=parse_time_to_seconds)
-                        if sorted_times:
-                            service_schedule_for_direction[service_id] = sorted_times
-                    if service_schedule_for_direction:
-                        direction_schedule[direction_key] = service_schedule_for_direction
-
-                stop_payload["serviceScheduleByDirection"] = direction_schedule
-
-            route_stops.append(stop_payload)
-
-        shapes = choose_display_shapes(
-            route_shapes.get(route_id, []),
-            direction_keys,
-            route_direction_trip_counts.get(route_id, {}),
-            route_direction_shape_trip_counts.get(route_id, {}),
-        )
-
-        all_lats: list[float] = []
-        all_lons: list[float] = []
-        for shape in shapes:
-            for lat, lon in shape["points"]:
-                all_lats.append(float(lat))
-                all_lons.append(float(lon))
-        for stop in route_stops:
-            all_lats.append(float(stop["lat"]))
-            all_lons.append(float(stop["lon"]))
-
-        bounds = None
-        if all_lats and all_lons:
-            bounds = [
-                [round(min(all_lats), 6), round(min(all_lons), 6)],
-                [round(max(all_lats), 6), round(max(all_lons), 6)],
-            ]
-
-        representative_dates_json = {
-            day_key: (
-                representative_dates[route_id][day_key].isoformat()
-                if representative_dates[route_id][day_key]
-                else None
-            )
-            for day_key in DAY_KEYS
-        }
-
-        filename = (
-            f"{agency_id}_{sanitize_filename(meta['shortName'])}_{sanitize_filename(route_id)}.json"
-        )
-        route_file_rel = f"routes/{filename}"
-
-        route_payload = {
-            "key": route_key,
-            "agencyId": agency_id,
-            "agencyLabel": agency_label,
-            "mode": meta["mode"],
-            "routeId": route_id,
-            "shortName": meta["shortName"],
-            "longName": meta["longName"],
-            "routeDesc": meta["routeDesc"],
-            "label": meta["label"],
-            "color": meta["color"],
-            "gtfsColor": meta["gtfsColor"],
-            "tripCount": len(route_trip_ids[route_id]),
-            "stopCount": len(route_stops),
-            "shapeCount": len(shapes),
-            "bounds": bounds,
-            "shapes": shapes,
-            "stops": route_stops,
-            "directionLabels": direction_labels,
-        }
-        if schedule_mode == "inline":
-            active_services_by_direction_json = {
-                direction_key: {
-                    day_key: sorted(
-                        active_services_by_route_day_direction[route_id][direction_key][day_key]
-                    )
-                    for day_key in DAY_KEYS
-                }
-                for direction_key in direction_keys
-            }
-            route_payload["representativeDates"] = representative_dates_json
-            route_payload["activeServicesByDayByDirection"] = active_services_by_direction_json
-        elif schedule_mode == "external":
-            if schedules_dir is None:
-                raise RuntimeError("schedules_dir is required when schedule_mode='external'")
-
-            day_schedules_by_stop_by_direction: dict[str, dict[str, dict[str, list[str]]]] = {}
-            for stop in route_stops:
-                stop_id = stop["stopId"]
-                day_schedule_by_direction: dict[str, dict[str, list[str]]] = {}
-
-                for direction_key in direction_keys:
-                    day_schedule_for_direction: dict[str, list[str]] = {}
-                    by_service = route_stop_schedule_by_service_direction[route_id][stop_id].get(
-                        direction_key, {}
-                    )
-                    for day_key in DAY_KEYS:
-                        merged: set[str] = set()
-                        active_services = active_services_by_route_day_direction[route_id][
-                            direction_key
-                        ][day_key]
-                        for service_id in active_services:
-                            merged.update(by_service.get(service_id, set()))
-
-                        sorted_times = sorted(merged, key=parse_time_to_seconds)
-                        day_schedule_for_direction[day_key] = sorted_times
-
-                    day_schedule_by_direction[direction_key] = day_schedule_for_direction
-
-                day_schedules_by_stop_by_direction[stop_id] = day_schedule_by_direction
-
-            schedule_filename = filename.replace(".json", "_schedule.json")
-            schedule_file_rel = f"schedules/{schedule_filename}"
-            schedule_payload = {
-                "key": route_key,
-                "agencyId": agency_id,
-                "routeId": route_id,
-                "representativeDates": representative_dates_json,
-                "directionLabels": direction_labels,
-                "daySchedulesByStopByDirection": day_schedules_by_stop_by_direction,
-            }
-            (schedules_dir / schedule_filename).write_text(
-                json.dumps(schedule_payload, separators=(",", ":")),
-                encoding="utf-8",
-            )
-            route_payload["scheduleFile"] = schedule_file_rel
-
-        (routes_dir / filename).write_text(
-            json.dumps(route_payload, separators=(",", ":")),
-            encoding="utf-8",
-        )
-
-        search_parts = [
-            meta["shortName"],
-            meta["longName"],
-            meta["routeDesc"],
-            agency_label,
-        ]
-        if meta["mode"] == "rail":
-            search_parts.append("rail train line station")
-        else:
-            search_parts.append("bus route stop")
-        if agency_id == "princeton":
-            if meta["shortName"] in {"TPL", "TPLEXP"}:
-                search_parts.append("Princeton Loop")
-            elif meta["shortName"] == "WS":
-                search_parts.append("Weekend Shopper")
-            else:
-                search_parts.append("TigerTransit Tiger Transit")
-
-        long_bits = " ".join(part for part in search_parts if part)
-
-        manifest_entry = {
-            "key": route_key,
-            "agencyId": agency_id,
-            "agencyLabel": agency_label,
-            "mode": meta["mode"],
-            "routeId": route_id,
-            "shortName": meta["shortName"],
-            "longName": meta["longName"],
-            "routeDesc": meta["routeDesc"],
-            "label": meta["label"],
-            "color": meta["color"],
-            "tripCount": len(route_trip_ids[route_id]),
-            "stopCount": len(route_stops),
-            "shapeCount": len(shapes),
-            "bounds": bounds,
-            "file": route_file_rel,
-            "searchText": long_bits.lower(),
-        }
-        if schedule_mode == "external":
-            manifest_entry["scheduleFile"] = route_payload.get("scheduleFile")
-
-        manifest_entries.append(manifest_entry)
+    emit_state = {
+        "route_meta": route_meta,
+        "agency_id": agency_id,
+        "agency_label": agency_label,
+        "routes_dir": routes_dir,
+        "schedules_dir": schedules_dir,
+        "schedule_mode": schedule_mode,
+        "pretty": pretty,
+        "gzip_level": gzip_level,
+        "route_trip_ids": route_trip_ids,
+        "route_service_ids": route_service_ids,
+        "route_direction_keys": route_direction_keys,
+        "route_direction_labels": route_direction_labels,
+        "route_direction_trip_counts": route_direction_trip_counts,
+        "route_direction_shape_trip_counts": route_direction_shape_trip_counts,
+        "representative_dates": representative_dates,
+        "active_services_by_route_day_direction": active_services_by_route_day_direction,
+        "route_stop_ids": route_stop_ids,
+        "stop_schedule_seconds": stop_schedule_seconds,
+        "stop_info": stop_info,
+        "route_shapes": route_shapes,
+    }
+    emitted = emit_routes(emit_state, list(route_meta), jobs)
+    manifest_entries = [manifest_entry for manifest_entry, _ in emitted]
+    files_changed = any(changed for _, changed in emitted)
 
     source_meta = {
         "agencyId": agency_id,
@@ -990,10 +1231,56 @@ def build_feed(
         "feedUpdatedAt": feed_updated_at,
     }
 
-    return source_meta, manifest_entries
+    return source_meta, manifest_entries, files_changed
 
 
-def main() -> int:
+def download_feed(feed: dict) -> None:
+    zip_path = pathlib.Path(feed["zip_path"])
+    print(f"Downloading {feed['gtfs_url']} -> {zip_path}")
+    download_gtfs(feed["gtfs_url"], zip_path)
+
+
+def process_feed(
+    feed: dict,
+    routes_dir: pathlib.Path,
+    schedules_dir: pathlib.Path | None,
+    max_shape_points: int,
+    schedule_mode: str,
+    today: dt.date,
+    jobs: int,
+    pretty: bool,
+    gzip_level: int,
+) -> tuple[dict, list[dict], bool]:
+    zip_path = pathlib.Path(feed["zip_path"])
+    print(f"Building routes for {feed['label']} from {zip_path}")
+    return build_feed(
+        feed,
+        zip_path,
+        routes_dir,
+        schedules_dir,
+        max_shape_points,
+        schedule_mode,
+        today,
+        jobs,
+        pretty,
+        gzip_level,
+    )
+
+
+def split_emit_jobs(jobs: int, feeds: typing.Sequence[dict]) -> list[int]:
+    """Share ``jobs`` route-emit workers across feeds in proportion to their GTFS zip sizes.
+
+    Every feed gets at least one worker and the largest feed takes any remainder, so the
+    total can exceed ``jobs`` by up to ``len(feeds) - 1`` when tiny feeds round up to one.
+    """
+    weights = [os.path.getsize(feed["zip_path"]) for feed in feeds]
+    total = sum(weights) or 1
+    shares = [max(1, jobs * weight // total) for weight in weights]
+    shares[weights.index(max(weights))] += max(0, jobs - sum(shares))
+    return shares
+
+
+def build_arg_parser() -> argparse.ArgumentParser:
     parser = argparse.ArgumentParser()
     parser.add_argument(
         "--refresh",
@@ -1021,15 +1308,44 @@ def main() -> int:
         action="store_true",
         help="Omit stop-level schedule data entirely",
     )
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        default=os.cpu_count() or 1,
+        help=(
+            "Total worker processes (1 disables parallelism). Feeds are built side by side, one "
+            "worker each, and route writing is split between feeds by GTFS zip size; the split is "
+            "fixed up front, so cores freed when a small feed finishes are not reused"
+        ),
+    )
+    parser.add_argument(
+        "--pretty",
+        action="store_true",
+        help="Indent manifest, route, and schedule JSON for readability (default: compact)",
+    )
+    parser.add_argument(
+        "--gzip-level",
+        type=int,
+        default=0,
+        help="Also write precompressed .json.gz files at this gzip level (1-9; 0 disables)",
+    )
     parser.add_argument(
         "--web-slim",
         action="store_true",
         help=argparse.SUPPRESS,
     )
-    args = parser.parse_args()
+    return parser
+
+
+def main() -> int:
+    args = build_arg_parser().parse_args()
 
     if args.max_shape_points < 50:
         raise SystemExit("--max-shape-points must be >= 50")
+    if args.jobs < 1:
+        raise SystemExit("--jobs must be >= 1")
+    if not 0 <= args.gzip_level <= 9:
+        raise SystemExit("--gzip-level must be between 0 and 9")
 
     effective_max_shape_points = args.max_shape_points
     schedule_mode = "external"
@@ -1043,68 +1359,112 @@ def main() -> int:
     output_dir = pathlib.Path(args.output_dir)
     output_dir.mkdir(parents=True, exist_ok=True)
 
+    # Route and schedule files are overwritten in place (unchanged ones are skipped) and
+    # leftovers from earlier builds are pruned once every feed has been emitted.
     routes_dir = output_dir / "routes"
-    if routes_dir.exists():
-        shutil.rmtree(routes_dir)
     routes_dir.mkdir(parents=True, exist_ok=True)
 
     schedules_dir: pathlib.Path | None = None
     schedules_path = output_dir / "schedules"
-    if schedules_path.exists():
-        shutil.rmtree(schedules_path)
     if schedule_mode == "external":
         schedules_path.mkdir(parents=True, exist_ok=True)
         schedules_dir = schedules_path
+    else:
+        with contextlib.suppress(FileNotFoundError):
+            shutil.rmtree(schedules_path)
 
     today = dt.date.today()
+    agencies = []
     sources = []
     all_routes = []
 
-    for feed in FEEDS:
-        zip_path = pathlib.Path(feed["zip_path"])
-        if args.refresh or not zip_path.exists():
-            print(f"Downloading {feed['gtfs_url']} -> {zip_path}")
-            download_gtfs(feed["gtfs_url"], zip_path)
-
-        print(f"Building routes for {feed['label']} from {zip_path}")
-        source_meta, routes = build_feed(
-            feed,
-            zip_path,
-            routes_dir,
-            schedules_dir,
-            effective_max_shape_points,
-            schedule_mode,
-            today,
+    stale_feeds = [
+        feed for feed in FEEDS if args.refresh or not pathlib.Path(feed["zip_path"]).exists()
+    ]
+    if stale_feeds:
+        # Downloads are latency-bound; fetch them concurrently before any parsing starts.
+        with ThreadPoolExecutor(max_workers=min(8, len(stale_feeds))) as executor:
+            list(executor.map(download_feed, stale_feeds))
+
+    # Split --jobs between the two pool levels so nested emit pools don't multiply it; the
+    # bus feed dominates emit time, so weight each feed's share by its size.
+    feed_workers = min(args.jobs, len(FEEDS))
+    feed_emit_jobs = split_emit_jobs(args.jobs, FEEDS)
+    feed_job = functools.partial(
+        process_feed,
+        routes_dir=routes_dir,
+        schedules_dir=schedules_dir,
+        max_shape_points=effective_max_shape_points,
+        schedule_mode=schedule_mode,
+        today=today,
+        pretty=args.pretty,
+        gzip_level=args.gzip_level,
+    )
+    if feed_workers > 1:
+        # Feeds are independent and write disjoint route files, so build them side by side.
+        with ProcessPoolExecutor(max_workers=feed_workers) as executor:
+            futures = [
+                executor.submit(feed_job, feed, jobs=emit_jobs)
+                for feed, emit_jobs in zip(FEEDS, feed_emit_jobs)
+            ]
+            feed_results = [future.result() for future in futures]
+    else:
+        feed_results = [
+            feed_job(feed, jobs=emit_jobs) for feed, emit_jobs in zip(FEEDS, feed_emit_jobs)
+        ]
+
+    data_changed = False
+    route_count_by_agency: dict[str, int] = {}
+    for source_meta, routes, files_changed in feed_results:
+        agencies.append(
+            {
+                "id": source_meta["agencyId"],
+                "label": source_meta["agencyLabel"],
+                "description": source_meta["description"],
+            }
         )
         sources.append(source_meta)
         all_routes.extend(routes)
+        route_count_by_agency[source_meta["agencyId"]] = len(routes)
+        data_changed |= files_changed
+
+    emitted_route_files = output_file_names((row["file"] for row in all_routes), args.gzip_level)
+    data_changed |= remove_stale_files(routes_dir, emitted_route_files) > 0
+    if schedules_dir is not None:
+        emitted_schedule_files = output_file_names(
+            (row["scheduleFile"] for row in all_routes), args.gzip_level
+        )
+        data_changed |= remove_stale_files(schedules_dir, emitted_schedule_files) > 0
 
-    all_routes.sort(key=lambda row: (row["agencyLabel"], natural_sort_key(row["shortName"])))
+    # Decorate once so each natural_sort_key is computed a single time per route.
+    decorated_routes = [
+        ((row["agencyLabel"], natural_sort_key(row["shortName"])), row) for row in all_routes
+    ]
+    decorated_routes.sort(key=operator.itemgetter(0))
+    all_routes = [row for _, row in decorated_routes]
 
     manifest = {
-        "generatedAt": dt.datetime.now(dt.timezone.utc).isoformat(),
+        "generatedAt": dt.datetime.now(dt.timezone.utc).isoformat(timespec="seconds"),
         "timezone": "America/New_York",
-        "agencies": [
-            {
-                "id": feed["id"],
-                "label": feed["label"],
-                "description": feed["description"],
-            }
-            for feed in FEEDS
-        ],
+        "agencies": agencies,
         "sources": sources,
         "routeCount": len(all_routes),
         "routes": all_routes,
     }
 
     manifest_path = output_dir / "manifest.json"
-    manifest_path.write_text(json.dumps(manifest, indent=2), encoding="utf-8")
-
-    print(f"Wrote {manifest_path} with {manifest['routeCount']} routes")
-    by_agency = defaultdict(int)
-    for row in all_routes:
-        by_agency[row["agencyId"]] += 1
-    for agency_id, count in sorted(by_agency.items()):
+    # generatedAt doubles as the client's data revision, so keep it (and the file) as-is
+    # only when neither the manifest nor any route/schedule file changed.
+    if not data_changed and manifest_content_unchanged(manifest_path, manifest, args.pretty):
+        print(f"{manifest_path} unchanged ({manifest['routeCount']} routes)")
+    else:
+        write_output(manifest_path, dump_json(manifest, args.pretty), args.gzip_level)
+        print(f"Wrote {manifest_path} with {manifest['routeCount']} routes")
+    if not args.gzip_level:
+        # Don't leave a precompressed manifest from an earlier --gzip-level build behind.
+        with contextlib.suppress(FileNotFoundError):
+            manifest_path.with_name("manifest.json.gz").unlink()
+    for agency_id, count in sorted(route_count_by_agency.items()):
         print(f"{agency_id}: {count} routes")
 
     return 0